@@ -269,8 +269,9 @@ def save_database(database, file_path):
         will create both a TXT and SQL update with the same base name.
     """
     #ext = file_path.split('.')[-1]
-    database = database.astype(str)
-    database.to_csv(file_path, sep='\t', index=False)
+    # Encode array cells first, astype(str) would store numpy's truncated repr
+    database = serialize_array_columns(database).astype(str)
+    database.reset_index(drop=True).to_csv(file_path, sep='\t', index=False)
     """
     table_name = basename(file_path).replace(f".{ext}", '').replace('-','_')
     file_name = file_path.split('/')[-1]
@@ -356,6 +357,37 @@ def deserialize_array(blob, dtype=np.float64):  # Adjust dtype as needed
     return np.frombuffer(blob, dtype=dtype)
 
 
+def serialize_array_columns(dataframe):
+    """
+    Encodes any columns holding numpy arrays as bytes so the frame can be
+    written to SQLite. This is the inverse of deserialize_array, arrays are
+    kept as ndarrays everywhere else and only encoded at the database write.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Frame that may contain array cells, e.g. parsed Sinton IV data.
+
+    Returns
+    -------
+    pandas.DataFrame with array cells replaced by their raw bytes.
+
+    """
+    array_cols = []
+    for col in dataframe.select_dtypes(include='object').columns:
+        values = dataframe[col].dropna()
+        if not values.empty and isinstance(values.iloc[0], np.ndarray):
+            array_cols.append(col)
+
+    if not array_cols:
+        return dataframe
+
+    return dataframe.assign(**{
+        col: dataframe[col].map(
+            lambda x: x.tobytes() if isinstance(x, np.ndarray) else x)
+        for col in array_cols})
+
+
 def create_sqlite_record(table_name, columns, values):
     """
     Inserts a single new entry to the database
@@ -500,6 +532,8 @@ def blank_insert_to_database(table_name, dataframe):
     Should only be called during exception handling or one of inserts to the
     database
     """
+    dataframe = serialize_array_columns(dataframe)
+
     with sq.connect(database) as connection:
 
         dataframe.to_sql(
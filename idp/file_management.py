@@ -12,8 +12,18 @@ from os.path import basename
 import pandas as pd
 import os
 import shutil
-root = tk.Tk()
-root.withdraw()
+
+# Hidden Tk root for the bare filedialog prompts, created on first use so
+# that importing this module (e.g. in process pool workers) doesn't start Tk
+_root = None
+
+
+def _hidden_root():
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+    return _root
 
 
 # ============General functions for file manipulation========= #
@@ -83,6 +93,7 @@ def copy_files(files_to_copy, dst=None):
     '''
     # Prompt user if dst is not defined
     if not os.path.isdir(dst):
+        _hidden_root()
         dst = filedialog.askdirectory(
             title='Select directory to store copied files.')
 
@@ -217,6 +228,7 @@ def search_folders(date_threshold=20000000, parent_folder_path=''):
     """
 
     if not os.path.isdir(parent_folder_path):
+        _hidden_root()
         parent_folder_path = filedialog.askdirectory(
             title='Select source of data files to search through.')
 
@@ -254,6 +266,7 @@ def search_files(serial_numbers=None, instrument_data_path=''):
 
     # Prompt user if src is not defined
     if not os.path.isdir(instrument_data_path):
+        _hidden_root()
         instrument_data_path = filedialog.askdirectory(
             title='Select source of data files to search through.')
 
@@ -310,6 +323,7 @@ def copy_data_to_folder(instrument_data_dict=None, dst=None, raw_el_images=True)
 
     # If there is no dst folder specified, prompt user
     if not dst:
+        _hidden_root()
         dst = filedialog.askdirectory(
             title='Select folder where files will be copied to.')
 
@@ -348,6 +362,35 @@ def get_files_in_directory(source_dir=None):
     return all_files
 
 
+def list_tree(folder_list):
+    """
+    Recursively list every file below the folders in folder_list using
+    os.scandir, as (dirpath, filename, casefolded filename) tuples in os.walk
+    order. List once per parse and filter the result for each file type.
+    Like os.walk, symlinked directories are neither listed nor followed
+    """
+    files = []
+
+    def scan(dirpath):
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    else:
+                        files.append((dirpath, entry.name, entry.name.casefold()))
+        except OSError:
+            return
+        for subdir in subdirs:
+            scan(subdir)
+
+    for folder in folder_list:
+        scan(folder)
+    return files
+
+
 # === THE FOLLOWING FUNCTIONS ARE USED IN THE COMPLETE ANALYSIS PIPELINE === #
 #================= Sinton I-V related functions =================#
 
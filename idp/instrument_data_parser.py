@@ -8,12 +8,26 @@ This script is meant to replace the series of scripts that are in
 the database folder
 """
 import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from tqdm import tqdm
 import idp.file_management as fm
-import exifread
 import idp.SintonFMT_LIB as SintonFMT_LIB
-from PIL import Image
+from scripts.sqlite_operations import array_columns, encode_array
+from PIL import Image, ExifTags
 from PIL.TiffTags import TAGS
+from PIL.TiffImagePlugin import IFDRational
+from exifread.tags import IGNORE_TAGS
+from exifread.tags.exif import EXIF_TAGS, GPS_TAGS, INTEROP_TAGS
+from exifread.utils import Ratio
+
+# Translation table used to strip quotes from MFR header values
+_QUOTES = str.maketrans('', '', '"')
+
+# ProcessPoolExecutor refuses more than 61 workers on Windows
+MAX_WORKERS = min(os.cpu_count() or 1, 61)
 
 arrays = ['isc_array_raw', 'isc_array_interp',
           'intensity_array', 'voc_array_raw', 'voc_array_interp',
@@ -30,34 +44,95 @@ def serialize_array(arr):
     return arr.tobytes()
 
 
+def _exif_printable(value, tag_entry):
+    """
+    Render a Pillow EXIF value the way exifread's .printable does, using
+    exifread's tag tables for enumerated and UNDEFINED tags, e.g. '1/125',
+    'Horizontal (normal)', 'YCbCr', '[2, 2, 0, 0]'
+    """
+    if isinstance(value, str):
+        values = value
+    elif isinstance(value, bytes):
+        values = list(value)
+    else:
+        values = list(value) if isinstance(value, tuple) else [value]
+        # Ratio keeps 0/0, which cameras write for unset rationals
+        values = [Ratio(v.numerator, v.denominator) if isinstance(v, IFDRational) else v
+                  for v in values]
+
+    if not isinstance(values, str) and len(values) == 1:
+        printable = str(values[0])
+    elif not isinstance(values, str) and len(values) > 50:
+        printable = str(values[0:20])[0:-1] + ", ... ]"
+    else:
+        printable = str(values)
+
+    lookup = tag_entry[1] if tag_entry else None
+    if callable(lookup):
+        printable = lookup(values)
+    elif isinstance(lookup, dict):
+        printable = ''.join(lookup.get(v, repr(v)) for v in values)
+    return printable
+
+
+def read_jpeg_exif(image_file):
+    """
+    Read the EXIF tags of a JPEG with Pillow, keyed and formatted like
+    exifread.process_file(details=False) so the elsave columns keep their
+    names and values. MakerNote and UserComment are skipped, as exifread
+    does without details, and so is the embedded thumbnail
+    """
+    with Image.open(image_file) as img:
+        exif = img.getexif()
+        exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+        # Pillow raises KeyError for the Interop IFD when there is no pointer to it
+        interop_ifd = exif.get_ifd(ExifTags.IFD.Interop) if ExifTags.IFD.Interop in exif_ifd else {}
+        ifds = (('Image', dict(exif), EXIF_TAGS),
+                ('Thumbnail', exif.get_ifd(ExifTags.IFD.IFD1), EXIF_TAGS),
+                ('EXIF', exif_ifd, EXIF_TAGS),
+                ('GPS', exif.get_ifd(ExifTags.IFD.GPSInfo), GPS_TAGS),
+                ('Interoperability', interop_ifd, INTEROP_TAGS))
+    tags = {}
+    for ifd_name, ifd, tag_dict in ifds:
+        for tag, value in ifd.items():
+            if tag in IGNORE_TAGS:
+                continue
+            tag_entry = tag_dict.get(tag)
+            tag_name = tag_entry[0] if tag_entry else f'Tag 0x{tag:04X}'
+            tags[f'{ifd_name} {tag_name}'] = _exif_printable(value, tag_entry)
+    return tags
+
+
 def extract_image_metadata(image_file):
     
-    if image_file.endswith(".jpg"):
-        with open(image_file, 'rb') as f:
-            exif_data = exifread.process_file(f, details=False)
-        return {tag: value.printable for tag, value in exif_data.items()}
-    elif image_file.endswith(".tif"):
+    if image_file.lower().endswith(".jpg"):
+        return read_jpeg_exif(image_file)
+    elif image_file.lower().endswith(".tif"):
         with Image.open(image_file) as img:
             tiff_dict = {TAGS[key] : img.tag[key] for key in img.tag.iterkeys()}
         return tiff_dict
 
+
 # Algorithm to go through entire folder, and select each file for processing
 
-def get_files_from_folders(folder_list=[], filetype='txt', filename_only=True):
+def get_files_from_folders(folder_list=[], filetype='txt', filename_only=True, listing=None):
     """
     Used to traverse the filesystem looking for a specific file type, folder
-    list is an output of the Search Folder function
+    list is an output of the Search Folder function. The extension match is
+    case-insensitive. Pass listing, a file_management.list_tree result for
+    folder_list, to filter one walk for several file types
     """
+    if listing is None:
+        listing = fm.list_tree(folder_list)
+    suffix = f".{filetype}".casefold()
     filetype_folder = []
-    for folder in folder_list:
-        for dirpath, dirnames, filenames in os.walk(folder):
-            for filename in filenames:
-                if filename.endswith(f".{filetype}"):
-                    if filename_only:
-                        filetype_folder.append(filename.split('.')[0])
-                    else:
-                        file = os.path.join(dirpath, filename)
-                        filetype_folder.append(file)
+    for dirpath, filename, folded in listing:
+        if folded.endswith(suffix):
+            if filename_only:
+                filetype_folder.append(os.path.splitext(filename)[0])
+            else:
+                file = os.path.join(dirpath, filename)
+                filetype_folder.append(file)
     return filetype_folder
 
 
@@ -67,98 +142,178 @@ def list_to_dict(lst):
     """
     result = {}
     for item in lst:
-        try:
-            key, value = item.split('=')
-            result[key] = value.replace('"', '').strip()
-        except Exception:
-            pass
+        key, sep, value = item.partition('=')
+        # Lines with a second '=' (the averaged array data) are skipped, as the
+        # old two-way split did
+        if sep and '=' not in value:
+            result[key] = value.translate(_QUOTES).strip()
     return result
 
 
-def parse_sinton_fmt_metadata(folder_list):
+def _process_sinton_file(file):
     """
-    Parameters
-    ----------
-    folder_list : List of lists, each list being a date folder that contains the MFRs
-        DESCRIPTION.
+    Worker for parse_sinton_fmt_metadata, runs in a separate process.
+    Returns (content, None) on success or (None, error) if the file failed
+    """
+    try:
+        # Use sinton library to extract, correct, and interpolate iv data
+        data, content = SintonFMT_LIB.import_raw_data_from_file(file)
+        metadata_dict = fm.get_filename_metadata(file, datatype='iv')
+
+        corrected_data = SintonFMT_LIB.correct_raw_data(data)
+        interpol_data = SintonFMT_LIB.interpolate_load_data(corrected_data)
+
+        # Arrays stay as ndarrays here, they are only encoded to bytes when
+        # written to the database (dm.serialize_array_columns)
+
+        # Turn contents of MFR file to dictonary
+        content = list_to_dict(content)
+
+        # Update with module metadata and extracted iv data
+        content.update(metadata_dict)
+        content.update(interpol_data)
+
+        content['filepath'] = file
+        content['filename'] = os.path.basename(file)  # Add
+
+        return content, None
+
+    except (ValueError, IndexError) as e:
+        return None, e
+
+
+def _process_el_file(file):
+    """
+    Worker for parse_image_metadata, runs in a separate process.
+    Returns (exif_data, None) on success or (None, error) if the file failed
+    """
+    try:
+        metadata_dict = fm.get_filename_metadata(file, 'el')
+
+        exif_data = extract_image_metadata(file)
+
+        exif_data.update(metadata_dict)
+
+        exif_data['filename'] = os.path.basename(file)
+
+        return exif_data, None
+
+    # OSError covers images that can't be opened, so one bad file doesn't
+    # abort the whole pool
+    except (ValueError, AttributeError, IndexError, OSError) as e:
+        return None, e
+
+
+def _write_rows(sink, rows):
+    """
+    Write buffered Sinton rows to a pyarrow ParquetWriter as one record batch.
+    Arrays are written with encode_array, as bytes plus a '<key>_shape'
+    string. Keys that are not in the writer's schema are ignored and missing
+    ones are written as null. Returns the number of rows written
+    """
+    for row in rows:
+        for key, value in list(row.items()):
+            if isinstance(value, np.ndarray):
+                row[key], row[f'{key}_shape'] = encode_array(value)
+            elif isinstance(value, str) and value.strip() == "":
+                row[key] = None
+    sink.write_batch(pa.RecordBatch.from_pylist(rows, schema=sink.schema))
+    return len(rows)
+
+
+def _map_in_windows(executor, fn, items, window, chunksize):
+    """
+    executor.map over items one window at a time, in order. The next window is
+    submitted before the current one is consumed so the pool stays busy, but
+    no more than two windows are ever in flight
+    """
+    pending = None
+    for start in range(0, len(items), max(1, window)):
+        submitted = executor.map(fn, items[start:start + window], chunksize=chunksize)
+        if pending is not None:
+            yield from pending
+        pending = submitted
+    if pending is not None:
+        yield from pending
 
-    Returns
-    -------
-    Pandas dataframe representing the tabular form of the data passed in as folders. 
 
+def _iter_sinton_rows(folder_list, failed_files, window=None):
+    """
+    Parse every MFR file below folder_list in a process pool and yield one
+    row dict per file, in file order. Files that fail are appended to
+    failed_files. If window is given, only that many files are submitted
+    ahead of the consumer at a time
     """
 
 # Lines from the MFR file output from the sinton
 
-    failed_files = []
+    # One walk for this run, shared by the .mfr and .txt lookups
+    listing = fm.list_tree(folder_list)
 
     mfr_filepaths = get_files_from_folders(
-        folder_list, filetype='mfr', filename_only=False)
+        folder_list, filetype='mfr', filename_only=False, listing=listing)
     txt_filenames = get_files_from_folders(
-        folder_list, filetype='txt', filename_only=True)
+        folder_list, filetype='txt', filename_only=True, listing=listing)
 
     print(f'{len(mfr_filepaths)} new files found ending in .MFR')
     print(f'{len(txt_filenames)} new files found ending in .TXT')
 
-    pd.set_option('display.max_colwidth', None)
+    # Set for O(1) lookups when pairing each MFR file with its TXT file
+    txt_filenames = set(txt_filenames)
 
 # Algorithm to go through each mrf file, and extract relevent information
-    for index, file in enumerate(mfr_filepaths):
-
-        # Parse files for metadata and data contained within text files
-        try:
-            # Use sinton library to extract, correct, and interpolate iv data
-            data, content = SintonFMT_LIB.import_raw_data_from_file(file)
-            metadata_dict = fm.get_filename_metadata(file, datatype='iv')
+    # Each file is independent, so the parsing is spread over a process pool
+    window = window or len(mfr_filepaths)
+    chunksize = max(1, window // (MAX_WORKERS * 4))
 
-            corrected_data = SintonFMT_LIB.correct_raw_data(data)
-            interpol_data = SintonFMT_LIB.interpolate_load_data(corrected_data)
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = _map_in_windows(
+            executor, _process_sinton_file, mfr_filepaths, window, chunksize)
 
-            for array in arrays:
-                interpol_data[array] = interpol_data[array].tobytes()
+        for file, (content, error) in tqdm(zip(mfr_filepaths, results), total=len(mfr_filepaths), desc='IV'):
 
-            #interpol_data[array] = " ".join(str(x) for x in interpol_data[array])
+            if error is not None:
+                failed_files.append(file)
+                tqdm.write(f'{file} failed to be processed, please review')
+                continue
 
-            # Turn contents of MFR file to dictonary
-            content = list_to_dict(content)
+            stem = os.path.splitext(content['filename'])[0]
+            if stem.replace('IVT', '') in txt_filenames:
+                content['txt_file'] = f'{stem}.txt'
+            else:
+                content['txt_file'] = 'N/A'
 
-            # Update with module metadata and extracted iv data
-            content.update(metadata_dict)
-            content.update(interpol_data)
+            yield content
 
-            content['filepath'] = file
-            content['filename'] = file.split('\\')[-1]  # Add
 
-            if content['filename'].replace('IVT', '').strip('.mfr') in txt_filenames:
-                content['txt_file'] = content['filename'].replace('mfr', 'txt')
-            else:
-                content['txt_file'] = 'N/A'
+def parse_sinton_fmt_metadata(folder_list):
+    """
+    Parameters
+    ----------
+    folder_list : List of lists, each list being a date folder that contains the MFRs
+        DESCRIPTION.
 
-            if index == 0:
-                frames = pd.DataFrame.from_dict(
-                    content, orient='index').T
-            else:
-                frames = pd.concat(
-                    [frames, pd.DataFrame([content])], ignore_index=True)
+    Returns
+    -------
+    Pandas dataframe representing the tabular form of the data passed in as
+    folders, and the list of files that failed to parse.
 
-                # frames = frames.append(frame) ## Doesnt work in 3.11
+    """
+    failed_files = []
 
-        except ValueError:
-            failed_files.append(file)
-            print(f'{file} failed to be processed, please review')
-            continue
-        except IndexError:
-            failed_files.append(file)
-            print(f'{file} failed to be processed, please review')
-            continue
+    rows = list(_iter_sinton_rows(folder_list, failed_files))
 
-        if (index % 10 == 0):
-            print(f'{index} IV curves processed so far...')
+    # Build the frame once instead of concatenating per file
+    frames = pd.DataFrame.from_records(rows)
 
         # Dropping N/A and blank values
+    # Array columns hold ndarrays, comparing those against "" is ambiguous.
+    # Found by content, SintonFMT_LIB returns more arrays than the arrays list
     nan_value = float("NaN")
-    frames.replace("", nan_value, inplace=True)
-    frames = frames.loc[:, frames.notna().all(axis=0)]
+    non_array_cols = frames.columns.difference(array_columns(frames))
+    frames[non_array_cols] = frames[non_array_cols].replace(
+        r'^\s*$', nan_value, regex=True)
+    frames = frames.dropna(axis=1, how='any')
 
     Sinton_IV_Metadata = frames.reset_index()
     #update_database.blank_insert_to_database('mfr', frames)
@@ -166,6 +321,45 @@ def parse_sinton_fmt_metadata(folder_list):
     return Sinton_IV_Metadata, failed_files
 
 
+def stream_sinton_fmt_metadata(folder_list, sink, batch_size=256):
+    """
+    Parse the MFR files like parse_sinton_fmt_metadata, but write the rows to
+    a Parquet writer in batches instead of building a dataframe.
+
+    Parameters
+    ----------
+    folder_list : List of lists, each list being a date folder that contains the MFRs
+    sink : pyarrow.parquet.ParquetWriter
+        The writer's schema picks the columns. Array columns should be binary,
+        each with a string '<column>_shape' column next to it.
+    batch_size : int, optional
+        Number of rows buffered before each write to sink. Files are submitted
+        to the pool in windows of max(batch_size, 4 x workers), at most two at
+        a time, so parsed rows can't pile up ahead of the writer. The default
+        is 256.
+
+    Returns
+    -------
+    The number of rows written, and the list of files that failed to parse.
+
+    """
+    failed_files = []
+    rows = []
+    rows_written = 0
+
+    window = max(batch_size, MAX_WORKERS * 4)
+    for content in _iter_sinton_rows(folder_list, failed_files, window):
+        rows.append(content)
+        if len(rows) >= batch_size:
+            rows_written += _write_rows(sink, rows)
+            rows = []
+
+    if rows:
+        rows_written += _write_rows(sink, rows)
+
+    return rows_written, failed_files
+
+
 def parse_image_metadata(folder_list):
     failed_files = []
 
@@ -174,43 +368,31 @@ def parse_image_metadata(folder_list):
 
     print(f'{len(el_filepaths)} new files found for EL')
 
-    for index, file in enumerate(el_filepaths):
-        try:
-            metadata_dict = fm.get_filename_metadata(file, 'el')
-                
-            exif_data = extract_image_metadata(file)
+    rows = []
 
-            exif_data.update(metadata_dict)
+    # Each image is independent, so the parsing is spread over a process pool
+    chunksize = max(1, len(el_filepaths) // (MAX_WORKERS * 4))
 
-            exif_data['filename'] = file.split('\\')[-1]
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            _process_el_file, el_filepaths, chunksize=chunksize)
 
-            frame = pd.DataFrame.from_dict(exif_data, orient='index').T
+        for file, (exif_data, error) in tqdm(zip(el_filepaths, results), total=len(el_filepaths), desc='EL'):
 
-            if index == 0:
-                frames = frame 
-            else:
-                frames = pd.concat(
-                    [frames, frame], ignore_index=True)
-            
-        except ValueError as ve:
-            print(f'{file} failed to be processed, please review. {ve}')
-            failed_files.append(file)
-            continue
-        except AttributeError as ae:
-            print(f'{file} failed to be processed, please review. {ae} ')
-            failed_files.append(file)
-            continue
-        except IndexError:
-            failed_files.append(file)
-            print(f'{file} failed to be processed, please review')
-            continue
-        if (index % 10 == 0):
-            print(f'{index} EL Images processed so far...')
-
-    frames = frames.dropna(axis=1, how='all')
-    frames = frames.loc[:, frames.notna().all(axis=0)]
+            if error is not None:
+                tqdm.write(f'{file} failed to be processed, please review. {error}')
+                failed_files.append(file)
+                continue
+
+            rows.append(exif_data)
+
+    # Build the frame once instead of concatenating per file
+    frames = pd.DataFrame.from_records(rows)
+
+    # Keep only the tags every image has
+    frames = frames.dropna(axis=1, how='any')
     
-    w['camera'] = 'EL_CCD'
+    frames['camera'] = 'EL_CCD'
 
     Image_Metadata = frames.reset_index()
 
@@ -239,7 +421,8 @@ folder_list = fm.search_folders(last_date)
 pd.set_option('display.max_colwidth', None)
 
 iv2, failed_files2 = parse_sinton_fmt_metadata(folder_list)
-iv = iv.astype(str)
+# Arrays must be encoded before astype(str), which would keep only numpy's truncated repr
+iv = dm.serialize_array_columns(iv2).astype(str)
 
 
 update_database.blank_insert_to_database('iv', iv)
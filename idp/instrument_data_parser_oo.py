@@ -20,17 +20,14 @@ Events and Errors are tracked and logged in the console output.
 
 import os
 import pandas as pd
-import exifread
 from PIL import Image
 from PIL.TiffTags import TAGS
 import idp.file_management as fm
 import idp.SintonFMT_LIB as SintonFMT_LIB
+from idp.instrument_data_parser import get_files_from_folders, list_to_dict, read_jpeg_exif
 import numpy as np
+from tqdm import tqdm
 
-# Set pandas to display all columns but handle binary data
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', 100)  # Limit column width to prevent binary data display
 
 class InstrumentDataParser:
     def __init__(self, folder_locations, sqlite_file_path):
@@ -51,30 +48,18 @@ class InstrumentDataParser:
         return data
 
     def extract_image_metadata(self, image_file):
-        if image_file.endswith(".jpg"):
-            with open(image_file, 'rb') as f:
-                exif_data = exifread.process_file(f, details=False)
-            # Convert bytes to string if necessary
-            return {tag: str(value) if isinstance(value, bytes) else value.printable for tag, value in exif_data.items()}
-        elif image_file.endswith(".tif"):
+        if image_file.lower().endswith(".jpg"):
+            # Same reader and key names as the functional parser
+            return read_jpeg_exif(image_file)
+        elif image_file.lower().endswith(".tif"):
             with Image.open(image_file) as img:
                 tiff_dict = {TAGS[key]: str(img.tag[key]) for key in img.tag.iterkeys()}
             return tiff_dict
 
-    def get_files_from_folders(self, folder_list=None, filetype='txt', filename_only=True):
+    def get_files_from_folders(self, folder_list=None, filetype='txt', filename_only=True, listing=None):
         if folder_list is None:
             folder_list = self.folder_locations
-        filetype_folder = []
-        for folder in folder_list:
-            for dirpath, dirnames, filenames in os.walk(folder):
-                for filename in filenames:
-                    if filename.endswith(f".{filetype}"):
-                        if filename_only:
-                            filetype_folder.append(filename.split('.')[0])
-                        else:
-                            file = os.path.join(dirpath, filename)
-                            filetype_folder.append(file)
-        return filetype_folder
+        return get_files_from_folders(folder_list, filetype, filename_only, listing)
 
     def parse_image_metadata(self):
         failed_files = []
@@ -82,20 +67,18 @@ class InstrumentDataParser:
         print(f'{len(el_filepaths)} new files found for EL')
         processed_data = []
         
-        for index, file in enumerate(el_filepaths):
+        for file in tqdm(el_filepaths, desc='EL'):
             try:
                 metadata_dict = fm.get_filename_metadata(file, 'el')
                 exif_data = self.extract_image_metadata(file)
                 exif_data.update(metadata_dict)
-                exif_data['filename'] = file.split('\\')[-1]
+                exif_data['filename'] = os.path.basename(file)
                 exif_data['camera'] = 'EL_CCD'
                 processed_data.append(exif_data)
             except Exception as e:
-                print(f'{file} failed to be processed, please review. {e}')
+                tqdm.write(f'{file} failed to be processed, please review. {e}')
                 failed_files.append(file)
                 continue
-            if (index % 10 == 0):
-                print(f'{index} EL Images processed so far...')
         
         print(f'Successfully processed {len(processed_data)} EL images')
         print(f'Failed to process {len(failed_files)} EL images')
@@ -103,13 +86,17 @@ class InstrumentDataParser:
 
     def parse_sinton_fmt_metadata(self):
         failed_files = []
-        mfr_filepaths = self.get_files_from_folders(filetype='mfr', filename_only=False)
-        txt_filenames = self.get_files_from_folders(filetype='txt', filename_only=True)
+        # One walk for this run, shared by the .mfr and .txt lookups
+        listing = fm.list_tree(self.folder_locations)
+        mfr_filepaths = self.get_files_from_folders(filetype='mfr', filename_only=False, listing=listing)
+        txt_filenames = self.get_files_from_folders(filetype='txt', filename_only=True, listing=listing)
         print(f'{len(mfr_filepaths)} new files found ending in .MFR')
         print(f'{len(txt_filenames)} new files found ending in .TXT')
+        # Set for O(1) lookups when pairing each MFR file with its TXT file
+        txt_filenames = set(txt_filenames)
         
         processed_data = []
-        for index, file in enumerate(mfr_filepaths):
+        for file in tqdm(mfr_filepaths, desc='IV'):
             try:
                 data, content = SintonFMT_LIB.import_raw_data_from_file(file)
                 metadata_dict = fm.get_filename_metadata(file, datatype='iv')
@@ -121,13 +108,14 @@ class InstrumentDataParser:
                     if array in interpol_data:
                         interpol_data[array] = np.array(interpol_data[array])
                 
-                content = {item.split('=')[0]: item.split('=')[1].replace('"', '').strip() for item in content if '=' in item}
+                content = list_to_dict(content)
                 content.update(metadata_dict)
                 content.update(interpol_data)
                 content['filepath'] = file
-                content['filename'] = file.split('\\')[-1]
-                if content['filename'].replace('IVT', '').strip('.mfr') in txt_filenames:
-                    content['txt_file'] = content['filename'].replace('mfr', 'txt')
+                content['filename'] = os.path.basename(file)
+                stem = os.path.splitext(content['filename'])[0]
+                if stem.replace('IVT', '') in txt_filenames:
+                    content['txt_file'] = f'{stem}.txt'
                 else:
                     content['txt_file'] = 'N/A'
                 
@@ -138,16 +126,40 @@ class InstrumentDataParser:
                 
                 processed_data.append(content)
             except Exception as e:
-                print(f'{file} failed to be processed, please review. {e}')
+                tqdm.write(f'{file} failed to be processed, please review. {e}')
                 failed_files.append(file)
                 continue
-            if (index % 10 == 0):
-                print(f'{index} IV curves processed so far...')
         
         print(f'Successfully processed {len(processed_data)} IV curves')
         print(f'Failed to process {len(failed_files)} IV curves')
         return processed_data, failed_files
 
+    def create_viewable_dataframe(self, data):
+        """
+        Create a DataFrame for display with each array cell summarised as
+        'mean ± std' along its last axis, one entry per channel for 2-D/3-D sweeps
+        """
+        df = pd.DataFrame(data)
+        for col in df.columns:
+            # Known array columns (possibly stored as bytes) plus any other ndarray column
+            first = df[col].dropna()
+            if col not in self.arrays and not (len(first) and isinstance(first.iloc[0], np.ndarray)):
+                continue
+            values = df[col].map(self._format_array_data)
+            is_array = values.map(lambda x: isinstance(x, np.ndarray) and x.size > 0)
+            arrays = values[is_array]
+            summary = pd.Series(None, index=df.index, dtype=object)
+            # One numpy reduction per distinct sweep shape, usually a single one per column
+            for _, group in arrays.groupby(arrays.map(np.shape), sort=False):
+                stacked = np.stack(group.to_numpy())
+                means = stacked.mean(axis=-1).reshape(len(group), -1)
+                stds = stacked.std(axis=-1).reshape(len(group), -1)
+                labels = np.char.add(np.char.mod('%.3f', means), ' ± ')
+                labels = np.char.add(labels, np.char.mod('%.3f', stds))
+                summary[group.index] = [', '.join(row) for row in labels]
+            df[col] = summary
+        return df
+
     def log_parsing_results(self, image_metadata, failed_image_files, sinton_metadata, failed_sinton_files):
         """Log the results of parsing image and Sinton metadata."""
         if image_metadata:
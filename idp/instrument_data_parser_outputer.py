@@ -31,6 +31,7 @@ class InstrumentDataParserOutputer:
                 'correlations': os.path.join(self.timestamped_dir, 'el', 'correlations'),
                 'categorical': os.path.join(self.timestamped_dir, 'el', 'categorical'),
                 'time_series': os.path.join(self.timestamped_dir, 'el', 'time_series'),
+                'parquet': os.path.join(self.timestamped_dir, 'el', 'parquet'),
                 # 'csv': os.path.join(self.timestamped_dir, 'el', 'csv')
             },
             'sinton': {
@@ -39,6 +40,7 @@ class InstrumentDataParserOutputer:
                 'scatter_matrix': os.path.join(self.timestamped_dir, 'sinton', 'scatter_matrix'),
                 'categorical': os.path.join(self.timestamped_dir, 'sinton', 'categorical'),
                 'time_series': os.path.join(self.timestamped_dir, 'sinton', 'time_series'),
+                'parquet': os.path.join(self.timestamped_dir, 'sinton', 'parquet'),
                 # 'csv': os.path.join(self.timestamped_dir, 'sinton', 'csv')
             }
         }
@@ -76,6 +78,17 @@ class InstrumentDataParserOutputer:
         base, ext = os.path.splitext(base_filename)
         return f"{base}_{self.timestamp}{ext}"
 
+    def save_to_parquet(self, df, filename, dataset_type):
+        """Save a DataFrame to a zstd-compressed Parquet file and store it in the class"""
+        self.dataframes[dataset_type] = df
+        parquet_dir = self._get_dataset_dir(dataset_type, 'parquet')
+        parquet_path = os.path.join(parquet_dir, self._get_timestamped_filename(filename))
+        # pyarrow can't convert the 2-D/3-D Sinton arrays, see encode_array for the layout
+        encoded = self.db.serialize_array_columns(df, include_shape=True)
+        encoded.reset_index(drop=True).to_parquet(parquet_path, compression='zstd', index=False)
+        print(f"Data saved to {parquet_path}")
+        return parquet_path
+
     def create_summary_plots(self, df, filename_prefix, dataset_type):
         """Create all available plots for the dataframe using the plotter"""
         self.plotter.create_summary_plots(df, filename_prefix, dataset_type)
@@ -11,6 +11,12 @@ class InstrumentDataParserPlotter:
     Handles all plotting and visualization for instrument data parsing workflows.
     Stores and saves plots for numeric, categorical, correlation, scatter, and time series data.
     """
+    # Date formats seen in FSEC filenames and EXIF tags, tried in order
+    date_formats = [
+        '%Y%m%d', '%Y-%m-%d', '%Y:%m:%d %H:%M:%S', '%Y-%m-%d %H:%M:%S',
+        '%m/%d/%Y', '%m/%d/%Y %H:%M'
+    ]
+
     def __init__(self, output_dir, timestamp, dataset_dirs):
         """
         Initialize the plotter with output directory, timestamp, and dataset-specific directories.
@@ -73,6 +79,26 @@ class InstrumentDataParserPlotter:
         base, ext = os.path.splitext(base_filename)
         return f"{base}_{self.timestamp}{ext}"
 
+    def _parse_dates(self, series):
+        """
+        Convert a column to datetimes in one vectorized call. The format is
+        picked from the first non-null value so pandas can parse the whole
+        column with it, rather than guessing the format for every cell.
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        sample = series.dropna()
+        if sample.empty:
+            return pd.to_datetime(series, errors='coerce')
+        sample = str(sample.iloc[0]).strip()
+        for fmt in self.date_formats:
+            try:
+                pd.to_datetime(sample, format=fmt, errors='raise')
+            except (ValueError, TypeError):
+                continue
+            return pd.to_datetime(series.astype(str).str.strip(), format=fmt, errors='coerce')
+        return pd.to_datetime(series, errors='coerce')
+
     def plot_numeric_columns(self, df, filename_prefix, dataset_type):
         """
         Create and save histograms for all numeric columns in the DataFrame.
@@ -122,13 +148,14 @@ class InstrumentDataParserPlotter:
         plots_dir = self._get_dataset_dir(dataset_type, 'time_series')
         if date_column in df.columns:
             try:
-                df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
-                df = df.dropna(subset=[date_column])
-                if len(df) == 0:
+                # Work on the two columns only, the caller's frame is not copied or modified
+                dates = self._parse_dates(df[date_column])
+                valid = dates.notna()
+                if not valid.any():
                     print(f"No valid dates found in {date_column}. Skipping time series plot.")
                     return
                 plt.figure(figsize=(12, 6))
-                plt.plot(df[date_column], df[value_column])
+                plt.plot(dates[valid], df.loc[valid, value_column])
                 plt.title(f'{value_column} over Time')
                 plt.xlabel('Date')
                 plt.ylabel(value_column)
@@ -186,8 +213,7 @@ class InstrumentDataParserPlotter:
         for col in categorical_cols:
             try:
                 plt.figure(figsize=(12, 6))
-                df[col] = df[col].astype(str).str.strip()
-                value_counts = df[col].value_counts()
+                value_counts = df[col].astype(str).str.strip().value_counts()
                 if len(value_counts) > 20:
                     value_counts = value_counts.head(20)
                     plt.title(f'Top 20 Categories in {col}')
@@ -155,7 +155,7 @@ def mfr_database_updater():
     final_mfr = updated_mfr_database.drop_duplicates(subset=['mfr_filename'])
 
 # Save the dataframe
-    final_mfr.to_csv(database_file_path, index=False, mode='w')
+    final_mfr.reset_index(drop=True).to_csv(database_file_path, index=False, mode='w')
     dm.save_database(final_mfr, database_file_path)
 
     print('mfr updated')
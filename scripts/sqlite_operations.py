@@ -5,11 +5,31 @@ Created on Wed Feb 19 17:51:57 2025
 @author: Brent Thompson
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3 as sq
 import logging
 
 
+def encode_array(arr):
+    """
+    Encode a numpy array as its raw bytes plus a shape string (e.g. '5,400').
+    This is the one array layout used for SQLite and Parquet, decode it with
+    np.frombuffer(data).reshape(tuple(map(int, shape.split(','))))
+    """
+    return arr.tobytes(), ','.join(map(str, arr.shape))
+
+
+def array_columns(dataframe):
+    """Names of the object columns whose first non-null value is a numpy array"""
+    array_cols = []
+    for col in dataframe.select_dtypes(include='object').columns:
+        values = dataframe[col].dropna()
+        if not values.empty and isinstance(values.iloc[0], np.ndarray):
+            array_cols.append(col)
+    return array_cols
+
+
 class SQLiteDB:
     def __init__(self, database_path):
         self.database_path = database_path
@@ -71,6 +91,30 @@ class SQLiteDB:
             self.handle_error(e, "reading records from table")
             return None
 
+    def serialize_array_columns(self, dataframe, include_shape=False):
+        """
+        Encode columns holding numpy arrays as bytes so they can be stored in SQLite or Parquet.
+
+        Parameters:
+        dataframe (pd.DataFrame): DataFrame that may contain array cells.
+        include_shape (bool): Also add a '<column>_shape' column (e.g. '5,400') so
+            multi-dimensional arrays can be reshaped after np.frombuffer.
+
+        Returns:
+        pd.DataFrame: DataFrame with array cells replaced by their raw bytes.
+        """
+        array_cols = array_columns(dataframe)
+        if not array_cols:
+            return dataframe
+        encoded = {
+            col: dataframe[col].map(lambda x: encode_array(x)[0] if isinstance(x, np.ndarray) else x)
+            for col in array_cols}
+        if include_shape:
+            for col in array_cols:
+                encoded[f'{col}_shape'] = dataframe[col].map(
+                    lambda x: encode_array(x)[1] if isinstance(x, np.ndarray) else None)
+        return dataframe.assign(**encoded)
+
     def blank_insert_to_database(self, table_name, dataframe):
         """
         Fallback function to save data to a table even if data format changes.
@@ -80,6 +124,7 @@ class SQLiteDB:
         dataframe (pd.DataFrame): DataFrame containing data to insert.
         """
         try:
+            dataframe = self.serialize_array_columns(dataframe)
             with sq.connect(self.database_path) as connection:
                 dataframe.to_sql(table_name, connection, if_exists='append', index=False, dtype={col: 'TEXT' for col in dataframe})
                 
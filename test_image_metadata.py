@@ -0,0 +1,44 @@
+import exifread
+from PIL import Image, ExifTags
+from PIL.TiffImagePlugin import IFDRational
+from idp.instrument_data_parser import extract_image_metadata
+
+
+def make_jpeg(path):
+    """Write a small JPEG with enumerated, UNDEFINED, GPS and unset (0/0) rational tags"""
+    exif = Image.Exif()
+    exif[0x010F] = 'Canon'
+    exif[0x0112] = 1  # Orientation
+    exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+    exif_ifd[0x829A] = IFDRational(1, 125)  # ExposureTime
+    exif_ifd[0x8822] = 1  # ExposureProgram
+    exif_ifd[0x9209] = 16  # Flash
+    exif_ifd[0x9101] = b'\x01\x02\x03\x00'  # ComponentsConfiguration
+    exif_ifd[0x9204] = IFDRational(0, 0)  # ExposureBiasValue, unset
+    exif_ifd[0x927C] = b'\x01\x02binary\xff'  # MakerNote
+    gps_ifd = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps_ifd[0x0000] = b'\x02\x02\x00\x00'
+    gps_ifd[0x0001] = 'N'
+    Image.new('L', (8, 8)).save(path, exif=exif)
+
+
+def test_jpeg_exif_matches_exifread(tmp_path):
+    image_file = str(tmp_path / 'EL_image.JPG')
+    make_jpeg(image_file)
+
+    with open(image_file, 'rb') as f:
+        expected = {tag: value.printable
+                    for tag, value in exifread.process_file(f, details=False).items()}
+
+    assert extract_image_metadata(image_file) == expected
+
+
+def test_unset_rational_is_kept(tmp_path):
+    image_file = str(tmp_path / 'EL_image.jpg')
+    make_jpeg(image_file)
+
+    tags = extract_image_metadata(image_file)
+
+    assert tags['EXIF ExposureBiasValue'] == '0/0'
+    assert tags['Image Orientation'] == 'Horizontal (normal)'
+    assert 'EXIF MakerNote' not in tags
@@ -45,8 +45,8 @@ def main():
         if 'JPEGThumbnail' in image_df.columns:
             image_df = image_df.drop('JPEGThumbnail', axis=1)
         
-        # Save to CSV and create visualizations
-        # outputer.save_to_csv(image_df, 'el_image_data.csv', dataset_type='el')
+        # Save to Parquet and create visualizations
+        outputer.save_to_parquet(image_df, 'el_image_data.parquet', dataset_type='el')
         print("\nCreating visualizations for image metadata...")
         outputer.create_summary_plots(image_df, 'el_image', dataset_type='el')
     else:
@@ -58,9 +58,10 @@ def main():
         print("\nProcessing Sinton metadata...")
         sinton_df = pd.DataFrame(sinton_metadata)
         print(f"Sinton metadata shape: {sinton_df.shape}")
+        print(parser.create_viewable_dataframe(sinton_metadata).head())
         
-        # Save to CSV and create visualizations
-        # outputer.save_to_csv(sinton_df, 'sinton_metadata.csv', dataset_type='sinton')
+        # Save to Parquet and create visualizations
+        outputer.save_to_parquet(sinton_df, 'sinton_metadata.parquet', dataset_type='sinton')
         print("\nCreating visualizations for Sinton metadata...")
         outputer.create_summary_plots(sinton_df, 'sinton', dataset_type='sinton')
     else:
@@ -71,6 +72,12 @@ def main():
     return outputer
 
 if __name__ == "__main__":
+    # Set pandas to display all columns but handle binary data
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    pd.set_option('display.max_colwidth', 100)  # Limit column width to prevent binary data display
+    pd.set_option('display.float_format', '{:.3f}'.format)  # Format floats at display time, data is left untouched
+
     # When running directly, store the outputer instance
     outputer = main()
     